@@ -13,6 +13,7 @@
 
 import socket
 import sys
+from profiler import Profiler
 from tormund_husband_of_chess import State
 
 
@@ -145,19 +146,23 @@ if __name__ == '__main__':
     password = sys.argv[2]
     client = Client('imcs.svcs.cs.pdx.edu', 3589, user, password)
     client.login()
+    profiler = Profiler('--profile' in sys.argv,
+                        '--profile-alloc' in sys.argv, 'imcs_client.folded')
     if '-o' in sys.argv:
         # offer and play a game
         client.offer('W')
         state = client.get_board()
         while state is not None:
             print('{} {}'.format(state.turn, state.move))
-            m = state.apply_alpha_beta(8, 7000)
+            with profiler.move('{} {}'.format(state.turn, state.move)):
+                m = state.apply_alpha_beta(8, 7000)
             print('making move: {}'.format(m.to_string()))
             client.send_move(m.to_string())
             state = client.get_board()
         print(client.winner)
     elif '-p' in sys.argv:
-        user = sys.argv[4]  # the user you want to play against
+        # the user you want to play against follows -p
+        user = sys.argv[sys.argv.index('-p') + 1]
         games = client.list_games()
         for g in games:
             if g[1] == user:
@@ -165,7 +170,8 @@ if __name__ == '__main__':
                 state = client.get_board()
                 while state is not None:
                     print('{} {}'.format(state.turn, state.move))
-                    m = state.apply_alpha_beta(8, 7000)
+                    with profiler.move('{} {}'.format(state.turn, state.move)):
+                        m = state.apply_alpha_beta(8, 7000)
                     print('making move: {}'.format(m.to_string()))
                     client.send_move(m.to_string())
                     state = client.get_board()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Plays many games at once through imcs_client.Client against the mock imcs
+# server (or any server given with --host/--port) and reports how long the
+# protocol takes per move.
+#
+# Every player runs in its own process, and so does the default mock server,
+# so one session's search doesn't hold the GIL while another is timing its
+# socket reads. With more players searching than there are CPU cores they
+# still share the CPUs, so keep -n at or under the core count when measuring
+# alongside --alpha-beta.
+#
+# For every move a player makes we record:
+#   think - time spent picking the move
+#   rtt   - time from sending the move until the next board has been parsed,
+#           minus the opponent's think time for its reply
+# The protocol-overhead share of a turn is rtt / (rtt + think).
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import argparse
+import multiprocessing
+import os
+import queue
+import socket
+import subprocess
+import sys
+import time
+from imcs_client import Client
+
+
+def choose_move(state, duration):
+    if duration:
+        return state.apply_alpha_beta(8, duration)
+    return state.sorted_moves()[0]
+
+
+def play(client, duration, moves):
+    ''' Play out a game, appending (elapsed, think) for each move made'''
+    state = client.get_board()
+    while state is not None:
+        start = time.perf_counter()
+        move = choose_move(state, duration)
+        think = time.perf_counter() - start
+        sent = time.perf_counter()
+        client.send_move(move.to_string())
+        state = client.get_board()
+        moves.append((time.perf_counter() - sent, think))
+
+
+def offering_player(args, n, moves):
+    client = Client(args.host, args.port, 'load-w{}'.format(n), 'pw')
+    client.login()
+    client.offer('W')
+    play(client, args.alpha_beta, moves)
+    client.logout()
+
+
+def accepting_player(args, n, moves):
+    client = Client(args.host, args.port, 'load-b{}'.format(n), 'pw')
+    client.login()
+    partner = 'load-w{}'.format(n)
+    game_id = None
+    deadline = time.monotonic() + args.timeout
+    while game_id is None:
+        for g in client.list_games():
+            if g[1] == partner:
+                game_id = g[0]
+        if game_id is None:
+            if time.monotonic() > deadline:
+                raise TimeoutError('no offer from {}'.format(partner))
+            time.sleep(0.01)
+    client.accept(game_id)
+    play(client, args.alpha_beta, moves)
+    client.logout()
+
+
+def run_player(args, n, color, results):
+    ''' Body of each player process, reports its moves on results'''
+    # a hung server or partner fails the session instead of the whole run
+    socket.setdefaulttimeout(args.timeout)
+    if not args.verbose:
+        sys.stdout = open(os.devnull, 'w')
+    target = offering_player if color == 'W' else accepting_player
+    moves = []
+    error = None
+    try:
+        target(args, n, moves)
+    except Exception as e:
+        error = '{} {}: {!r}'.format(target.__name__, n, e)
+    results.put((n, color, moves, error))
+
+
+def run_sessions(args):
+    results = multiprocessing.Queue()
+    procs = []
+    for n in range(args.sessions):
+        for color in ['W', 'B']:
+            procs.append(multiprocessing.Process(
+                target=run_player, args=(args, n, color, results)
+            ))
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    collected = []
+    while len(collected) < len(procs):
+        try:
+            collected.append(results.get(timeout=1))
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                break  # a player died without reporting
+    wall = time.perf_counter() - start
+    for p in procs:
+        p.join()
+    return collected, wall
+
+
+def round_trips(collected):
+    ''' Pair each player's moves with the opponent's to get (rtt, think)'''
+    games = {}
+    errors = []
+    for n, color, moves, error in collected:
+        games.setdefault(n, {})[color] = moves
+        if error is not None:
+            errors.append(error)
+    records = []
+    for players in games.values():
+        for color, moves in players.items():
+            replies = players.get('B' if color == 'W' else 'W', [])
+            for i, (elapsed, think) in enumerate(moves):
+                # W's n-th move is answered by B's n-th, B's by W's (n+1)-th
+                j = i if color == 'W' else i + 1
+                reply = replies[j][1] if j < len(replies) else 0
+                records.append((max(elapsed - reply, 0), think))
+    return records, errors
+
+
+def start_server():
+    ''' Run imcs_mock_server.py in a subprocess, return it and its port'''
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'imcs_mock_server.py')
+    server = subprocess.Popen([sys.executable, script, '0'],
+                              stdout=subprocess.PIPE, text=True)
+    port = int(server.stdout.readline().rsplit(':', 1)[1])
+    return server, port
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+def report(sessions, records, errors, wall):
+    print('games: {}  moves: {}  wall time: {:.2f}s'.format(
+        sessions, len(records), wall
+    ))
+    for e in errors:
+        print('error: {}'.format(e))
+    if not records:
+        return
+    rtts = [r[0] * 1000 for r in records]
+    shares = [r[0] / (r[0] + r[1]) for r in records if r[0] + r[1] > 0]
+    print('round trip (ms): mean {:.3f}  p50 {:.3f}  p95 {:.3f}  max {:.3f}'
+          .format(sum(rtts) / len(rtts), percentile(rtts, 0.5),
+                  percentile(rtts, 0.95), max(rtts)))
+    total_rtt = sum(r[0] for r in records)
+    total = sum(r[0] + r[1] for r in records)
+    print('protocol share of turn: mean {:.1%}  p95 {:.1%}  overall {:.1%}'
+          .format(sum(shares) / len(shares), percentile(shares, 0.95),
+                  total_rtt / total if total else 0))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='load test imcs_client against a mock imcs server')
+    parser.add_argument('-n', '--sessions', type=int, default=16,
+                        help='number of games to play at once')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=0,
+                        help='server port, default starts a local mock')
+    parser.add_argument('--alpha-beta', type=int, default=0, metavar='MS',
+                        help='search with alpha-beta for MS per move '
+                             'instead of the one-ply greedy player')
+    parser.add_argument('--timeout', type=float, default=30,
+                        help='seconds to wait on the server before a '
+                             'session gives up')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="show the clients' own output")
+    args = parser.parse_args()
+    server = None
+    if args.port == 0:
+        # the mock only listens on localhost
+        server, args.port = start_server()
+        args.host = 'localhost'
+    try:
+        collected, wall = run_sessions(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    records, errors = round_trips(collected)
+    report(args.sessions, records, errors, wall)
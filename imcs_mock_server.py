@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# A local stand-in for the imcs server. It only speaks the part of the
+# protocol that imcs_client.py uses: the version banner, 'me', 'list',
+# 'offer', 'accept', '!' moves and 'quit'. Moves are checked with the same
+# State class the player uses, so an illegal move forfeits the game.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import socket
+import socketserver
+import sys
+import threading
+from tormund_husband_of_chess import State
+
+VERSION = '2.5'
+CLOCK = '05:00.000 05:00.000'  # the mock doesn't keep time
+
+
+class Game:
+    def __init__(self, game_id, session, color):
+        self.id = game_id
+        self.color = color  # color chosen by the offering player
+        self.players = {color: session}
+        self.state = State()
+        self.lock = threading.Lock()
+
+    def other(self, color):
+        return 'B' if color == 'W' else 'W'
+
+    def in_progress(self):
+        return len(self.players) == 2
+
+    def board_lines(self):
+        lines = ['{} {}'.format(self.state.turn, self.state.move)]
+        lines += [''.join(row) for row in self.state.board]
+        return lines
+
+    def send_board(self, last_move=None):
+        lines = [] if last_move is None else ['! {}'.format(last_move), '']
+        lines += self.board_lines()
+        lines += ['', '? {}'.format(CLOCK)]
+        self.players[self.state.move].send_lines(lines)
+
+    def finish(self, result):
+        line = '= draw' if result == '=' else '= {} wins'.format(result)
+        for session in self.players.values():
+            session.send_lines([line])
+            session.game = None
+
+
+class MockServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, Session)
+        self.games = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def new_game(self, session, color):
+        with self.lock:
+            game = Game(self.next_id, session, color)
+            self.games[game.id] = game
+            self.next_id += 1
+        return game
+
+    def join_game(self, game_id, session):
+        # returns the game if it was still open, otherwise None
+        with self.lock:
+            game = self.games.get(game_id)
+            if game is None or game.in_progress():
+                return None
+            game.players[game.other(game.color)] = session
+        return game
+
+    def end_game(self, game):
+        with self.lock:
+            self.games.pop(game.id, None)
+
+    def list_lines(self):
+        with self.lock:
+            games = list(self.games.values())
+        lines = []
+        for game in games:
+            user = game.players[game.color].user
+            status = '[in-progress]' if game.in_progress() else '[offer]'
+            lines.append(' {} {} {} 300.000 300.000 0 1500 {}'.format(
+                game.id, user, game.color, status
+            ))
+        return lines
+
+
+class Session(socketserver.StreamRequestHandler):
+    '''One connected client. Each session runs in its own server thread'''
+
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.user = 'anonymous'
+        self.game = None
+        self.color = None
+        self.write_lock = threading.Lock()
+
+    def send_lines(self, lines):
+        data = ''.join(line + '\r\n' for line in lines).encode()
+        # the opponent's thread also writes to this socket
+        with self.write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                pass  # the client went away
+
+    def handle(self):
+        self.send_lines(['100 imcs {}'.format(VERSION)])
+        try:
+            for raw in self.rfile:
+                line = raw.decode().strip()
+                if not line:
+                    continue
+                cmd, _, args = line.partition(' ')
+                if cmd == 'quit':
+                    self.send_lines(['200 Goodbye'])
+                    break
+                elif cmd == 'me':
+                    self.login(args.split())
+                elif cmd == 'list':
+                    self.list_games()
+                elif cmd == 'offer':
+                    self.offer(args.strip())
+                elif cmd == 'accept':
+                    self.accept(args.split())
+                elif cmd == '!':
+                    self.move(args.strip())
+                else:
+                    self.send_lines(['501 unknown command'])
+        except OSError:
+            pass  # the client went away
+        finally:
+            self.forfeit()
+
+    def forfeit(self):
+        # leaving with a game still open loses it, so the opponent isn't
+        # left waiting for a board that will never come
+        game = self.game
+        if game is None:
+            return
+        with game.lock:
+            if self.game is not game:  # the game ended meanwhile
+                return
+            game.finish(game.other(self.color))
+        self.server.end_game(game)
+
+    def login(self, args):
+        if len(args) != 2:
+            self.send_lines(['401 bad login'])
+            return
+        self.user = args[0]
+        self.send_lines(['201 hello {}'.format(self.user)])
+
+    def list_games(self):
+        games = self.server.list_lines()
+        lines = ['211 {} available games'.format(len(games))]
+        self.send_lines(lines + games + ['.'])
+
+    def offer(self, color):
+        if color not in ['W', 'B'] or self.game is not None:
+            self.send_lines(['407 bad offer'])
+            return
+        self.game = self.server.new_game(self, color)
+        self.color = color
+        self.send_lines([
+            '103 {} game waiting for offer acceptance'.format(self.game.id)
+        ])
+
+    def accept(self, args):
+        game = None
+        if args and args[0].isdigit() and self.game is None:
+            game = self.server.join_game(int(args[0]), self)
+        if game is None:
+            self.send_lines(['408 no such game'])
+            return
+        self.game = game
+        self.color = game.other(game.color)
+        with game.lock:
+            for color, session in game.players.items():
+                code = '105' if color == 'W' else '106'
+                session.send_lines([
+                    '{} {} {} game begins'.format(code, game.id, color)
+                ])
+            game.send_board()
+
+    def move(self, move):
+        game = self.game
+        if game is None or not game.in_progress():
+            self.send_lines(['- not playing a game'])
+            return
+        with game.lock:
+            if game.state.move != self.color:
+                self.send_lines(['- not your turn'])
+                return
+            try:
+                game.state.send_move(move)
+            except Exception:
+                result = game.other(self.color)  # illegal move forfeits
+            else:
+                result = game.state.winner()
+                if result == '?' and not game.state.generate_all_moves():
+                    result = self.color  # side to move is stuck
+            if result == '?':
+                game.send_board(move)
+            else:
+                game.finish(result)
+                self.server.end_game(game)
+
+
+if __name__ == '__main__':
+    # port 0 picks a free port, the chosen one is printed on the first line
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 3589
+    server = MockServer(('localhost', port))
+    print('mock imcs listening on localhost:{}'.format(
+        server.server_address[1]
+    ), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
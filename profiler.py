@@ -0,0 +1,192 @@
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+# Opt-in profiling for the search. Wrap a move in 'with profiler.move(...)'.
+# With sampling on, a background thread samples the searching thread's
+# stack; after each move a per-function breakdown is printed and all samples
+# so far are written in folded-stack format, which flamegraph.pl, speedscope
+# and inferno all read. With alloc on, tracemalloc watches allocations and
+# an allocation summary is printed. tracemalloc slows the search a lot, and
+# the search is time limited, so it is a separate switch.
+#
+# When both are off, move() returns a no-op context and nothing is hooked
+# into the search itself, so it costs nothing to leave in.
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import collections
+import contextlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+
+class Profiler:
+    NFRAMES = 16  # deep enough to see our own frames under the stdlib
+    ALLOC_INTERVAL = 0.01  # seconds between allocation snapshots
+    # leave out what the profiler, and tracemalloc for it, allocates
+    IGNORE = [
+        tracemalloc.Filter(False, __file__, all_frames=True),
+        tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+    ]
+
+    def __init__(self, sample=False, alloc=False, out_path='profile.folded',
+                 interval=0.001, top=10):
+        self.sample = sample
+        self.alloc = alloc
+        self.out_path = out_path
+        self.interval = interval  # seconds between stack samples
+        self.top = top  # rows shown in each breakdown
+        self.stacks = collections.Counter()  # folded stacks for whole run
+
+    def move(self, label=''):
+        if not self.sample and not self.alloc:
+            return contextlib.nullcontext()
+        return self._profile_move(label)
+
+    @contextlib.contextmanager
+    def _profile_move(self, label):
+        stacks = collections.Counter()
+        sites = {}  # peak live (size, blocks) per allocation site
+        memory = {}
+        sampling = tracking = contextlib.nullcontext()
+        if self.sample:
+            sampling = self._sample_stacks(stacks)
+        if self.alloc:
+            tracking = self._track_allocations(sites, memory)
+        try:
+            # tracking sits inside sampling, so tracemalloc has stopped
+            # before the sampler thread is joined and the reports below run
+            with sampling, tracking:
+                start = time.perf_counter()
+                try:
+                    yield
+                finally:
+                    elapsed = time.perf_counter() - start
+        finally:
+            if self.sample:
+                self.stacks.update(stacks)
+                self.print_breakdown(label, stacks, elapsed)
+                self.write_folded()
+            if self.alloc:
+                if not self.sample:  # the breakdown prints the header
+                    print('profile {}: {:.0f} ms'.format(
+                        label, elapsed * 1000
+                    ))
+                self.print_allocations(sites, memory)
+
+    @contextlib.contextmanager
+    def _sample_stacks(self, stacks):
+        done = threading.Event()
+        target = threading.get_ident()
+        sampler = threading.Thread(
+            target=self._sample, args=(target, stacks, done), daemon=True
+        )
+        # let the sampler get the GIL about as often as it wants to sample
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.interval)
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+            sys.setswitchinterval(switch_interval)
+
+    @contextlib.contextmanager
+    def _track_allocations(self, sites, memory):
+        # the search frees nearly everything it allocates, so the net change
+        # says little; a watcher thread snapshots what is live every so often
+        # and keeps each site's peak, which is where the churn shows up
+        done = threading.Event()
+        watcher = threading.Thread(
+            target=self._watch, args=(sites, done), daemon=True
+        )
+        tracemalloc.start(self.NFRAMES)
+        watcher.start()
+        try:
+            yield
+        finally:
+            done.set()
+            watcher.join()
+            final = self._peak_sites(sites)
+            _, memory['peak'] = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory['net'] = sum(trace.size for trace in final.traces)
+
+    def _watch(self, sites, done):
+        while not done.wait(self.ALLOC_INTERVAL):
+            self._peak_sites(sites)
+
+    def _peak_sites(self, sites):
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.IGNORE)
+        for stat in snapshot.statistics('lineno'):
+            frame = stat.traceback[0]
+            site = '{}:{}'.format(os.path.basename(frame.filename),
+                                  frame.lineno)
+            if stat.size > sites.get(site, (0, 0))[0]:
+                sites[site] = (stat.size, stat.count)
+        return snapshot
+
+    def _sample(self, target, stacks, done):
+        while not done.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename == __file__:
+                    # the move itself never runs under our frames, so this
+                    # is the profiler setting up or tearing down
+                    stack = []
+                    break
+                # qualname tells State.__init__ from Move.__init__, but
+                # only exists from 3.11 on
+                name = getattr(code, 'co_qualname', code.co_name)
+                stack.append('{}:{}'.format(
+                    os.path.basename(code.co_filename), name
+                ))
+                frame = frame.f_back
+            if stack:
+                stacks[';'.join(reversed(stack))] += 1
+
+    def print_breakdown(self, label, stacks, elapsed):
+        total = sum(stacks.values())
+        print('profile {}: {:.0f} ms, {} samples'.format(
+            label, elapsed * 1000, total
+        ))
+        if total == 0:
+            return
+        if self.alloc:
+            print('  note: allocation tracking was on, so this search may '
+                  'have gone shallower\n'
+                  '  and allocation-heavy code looks bigger than in an '
+                  'unprofiled run')
+        own = collections.Counter()
+        inclusive = collections.Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):  # count recursive frames once
+                inclusive[frame] += count
+        print('  {:<60} {:>7} {:>7} {:>9}'.format(
+            'function', 'self%', 'total%', 'self ms'
+        ))
+        for frame, count in own.most_common(self.top):
+            print('  {:<60} {:>6.1f}% {:>6.1f}% {:>9.1f}'.format(
+                frame, 100 * count / total, 100 * inclusive[frame] / total,
+                elapsed * 1000 * count / total
+            ))
+
+    def print_allocations(self, sites, memory):
+        print('  allocations: peak {:.1f} KiB, net {:+.1f} KiB'.format(
+            memory['peak'] / 1024, memory['net'] / 1024
+        ))
+        ranked = sorted(sites.items(), key=lambda site: -site[1][0])
+        for site, (size, count) in ranked[:min(self.top, 5)]:
+            print('    {:<40} peak {:.1f} KiB ({} blocks)'.format(
+                site, size / 1024, count
+            ))
+
+    def write_folded(self):
+        with open(self.out_path, 'w') as f:
+            for stack, count in self.stacks.items():
+                f.write('{} {}\n'.format(stack, count))
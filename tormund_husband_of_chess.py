@@ -3,6 +3,7 @@
 import random
 import sys
 import time
+from profiler import Profiler
 
 
 class State:
@@ -458,7 +459,9 @@ def parse_input():
     return state
 
 
-def human_player(state):
+def human_player(state, profiler=None):
+    if profiler is None:
+        profiler = Profiler()
     print("you are player W, tormund (husband of chess) is B")
     while state.winner() == '?':
         print('________________________')
@@ -474,13 +477,15 @@ def human_player(state):
                 print('invalid move, try again')
                 continue
         else:
-            if '--alpha-beta' in sys.argv:
-                print('alpha-beta')
-                move = state.apply_alpha_beta(8, 3000)
-            elif '--negamax' in sys.argv:
-                move = state.apply_negamax(4, 3000)
-            else:  # only look at the states of the next move, ie easy-2-beat
-                move = state.sorted_moves()[0]
+            with profiler.move('{} {}'.format(state.turn, state.move)):
+                if '--alpha-beta' in sys.argv:
+                    print('alpha-beta')
+                    move = state.apply_alpha_beta(8, 3000)
+                elif '--negamax' in sys.argv:
+                    move = state.apply_negamax(4, 3000)
+                else:
+                    # only look at the states of the next move, ie easy-2-beat
+                    move = state.sorted_moves()[0]
             print('making move {}'.format(move.to_string()))
             state.apply_move(move)
     print('game over')
@@ -497,7 +502,9 @@ if __name__ == '__main__':
         state = State()
     if '-p' in sys.argv:
         # play against human player
-        human_player(state)
+        profiler = Profiler('--profile' in sys.argv,
+                            '--profile-alloc' in sys.argv, 'tormund.folded')
+        human_player(state, profiler)
     else:
         pass
         # print generated moves for state